@@ -4,80 +4,258 @@ Fetches publications from the MTMT API for author 10081350 (Marcell Balogh)
 and updates index.html with the latest data including citation counts.
 """
 
+import base64
 import html
+import http.client
+import io
 import json
+import os
 import re
+import urllib.parse
 import urllib.request
-import urllib.error
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import groupby
+from operator import itemgetter
+
+# orjson parses the large MTMT pages several times faster; both decoders
+# take the raw response bytes, so the stdlib one is a drop-in fallback.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 AUTHOR_MTID = 10081350
+MTMT_HOST = "m2.mtmt.hu"
 MTMT_API = (
-    "https://m2.mtmt.hu/api/publication"
+    "/api/publication"
     "?cond=authors;eq;{author_id}"
     "&sort=publishedYear,desc"
-    "&size=50"
+    "&size=500"
     "&labelLang=eng"
     "&format=json"
 )
+REQUEST_HEADERS = {"Accept": "application/json", "Connection": "keep-alive"}
+# Concurrent connections used once the page count is known
+MAX_WORKERS = 8
 INDEX_PATH = "index.html"
+# Raw MTMT pages plus their validators, for conditional requests
+CACHE_PATH = os.path.join(".cache", "mtmt.json")
 
 # Markers in index.html where generated publications go
 MARKER_START = "<!-- PUBLICATIONS_START -->"
 MARKER_END = "<!-- PUBLICATIONS_END -->"
+MARKERS_RE = re.compile(
+    re.escape(MARKER_START) + r".*?" + re.escape(MARKER_END), re.DOTALL
+)
+
+# ISSN-like suffixes in journal titles (e.g., "2061-2079 2061-2125")
+ISSN_RE = re.compile(r"\s+\d{4}-\d{3}[\dXx](\s+\d{4}-\d{3}[\dXx])*")
+
+
+def load_cache():
+    """Load cached MTMT pages keyed by request path (empty if missing)."""
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    """Persist cached MTMT pages; a failed write only costs the next run."""
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+    except OSError as e:
+        print(f"Warning: could not write cache {CACHE_PATH}: {e}")
+
+
+def open_connection():
+    """Open a keep-alive HTTPS connection to MTMT.
+
+    http.client ignores proxy settings, so honour HTTPS_PROXY/NO_PROXY
+    the way urlopen would by tunnelling through the proxy with CONNECT.
+    """
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(MTMT_HOST):
+        return http.client.HTTPSConnection(MTMT_HOST, timeout=30)
+
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    parts = urllib.parse.urlsplit(proxy)
+    headers = {}
+    if parts.username:
+        user = urllib.parse.unquote(parts.username)
+        password = urllib.parse.unquote(parts.password or "")
+        creds = base64.b64encode(f"{user}:{password}".encode()).decode("ascii")
+        headers["Proxy-Authorization"] = f"Basic {creds}"
+
+    conn = http.client.HTTPSConnection(
+        parts.hostname, parts.port or 80, timeout=30
+    )
+    conn.set_tunnel(MTMT_HOST, headers=headers)
+    return conn
+
+
+def fetch_page(conn, page, cache, fresh):
+    """Fetch and parse one page over ``conn``; returns None on error.
+
+    Sends the validators stored in ``cache`` so an unchanged page comes
+    back as a bodyless 304 and is served from disk instead. Every entry
+    requested in this run is recorded in ``fresh``, the cache to persist.
+    """
+    path = MTMT_API.format(author_id=AUTHOR_MTID) + f"&page={page}"
+    print(f"Fetching page {page}: https://{MTMT_HOST}{path}")
+
+    headers = dict(REQUEST_HEADERS)
+    cached = cache.get(path)
+    if cached:
+        # Carried over even if this request fails, refreshed on a 200
+        fresh[path] = cached
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()
+    except (http.client.HTTPException, OSError) as e:
+        print(f"Error fetching page {page}: {e}")
+        # Drop the broken socket; the next request reconnects.
+        conn.close()
+        return None
+
+    if resp.status == 304 and cached:
+        print(f"Page {page} unchanged, using cached copy.")
+        return cached["data"]
+
+    if 300 <= resp.status < 400 and resp.status != 304:
+        # Unlike urlopen, http.client does not follow redirects.
+        location = resp.getheader("Location")
+        print(
+            f"Error fetching page {page}: HTTP {resp.status} redirect to "
+            f"{location} (not followed; update MTMT_HOST/MTMT_API)"
+        )
+        return None
+
+    if resp.status != 200:
+        print(f"Error fetching page {page}: HTTP {resp.status} {resp.reason}")
+        return None
+
+    data = json_loads(body)
+
+    etag = resp.getheader("ETag")
+    last_modified = resp.getheader("Last-Modified")
+    if etag or last_modified:
+        fresh[path] = {"etag": etag, "last_modified": last_modified, "data": data}
+
+    return data
+
+
+def fetch_pages(pages, cache, fresh):
+    """Fetch several pages over one dedicated keep-alive connection."""
+    conn = open_connection()
+    try:
+        return [fetch_page(conn, page, cache, fresh) for page in pages]
+    finally:
+        conn.close()
+
+
+def total_pages(paging):
+    """Read the page count from MTMT paging metadata, or None if absent."""
+    if paging.get("totalPages") is not None:
+        return int(paging["totalPages"])
+    total = paging.get("totalElements", paging.get("total"))
+    size = paging.get("size")
+    if total is not None and size:
+        return -(-int(total) // int(size))
+    return None
 
 
 def fetch_publications():
     """Fetch all publications from the MTMT API (handles pagination)."""
     publications = []
-    page = 1
-
-    while True:
-        url = MTMT_API.format(author_id=AUTHOR_MTID) + f"&page={page}"
-        print(f"Fetching page {page}: {url}")
-
-        req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = json.loads(resp.read().decode("utf-8"))
-        except urllib.error.URLError as e:
-            print(f"Error fetching page {page}: {e}")
-            break
-
-        content = data.get("content", [])
-        if not content:
-            break
-
-        publications.extend(content)
-
-        paging = data.get("paging", {})
-        if paging.get("last", True):
-            break
-        page += 1
-
+    cache = load_cache()
+    # Only pages requested in this run are saved, so entries for pages that
+    # no longer exist, or from an older MTMT_API query, drop out.
+    fresh = {}
+
+    # One keep-alive connection for all pages, so the TCP+TLS handshake
+    # is paid once instead of once per page.
+    conn = open_connection()
+    data = fetch_page(conn, 1, cache, fresh)
+    paging = data.get("paging", {}) if data else {}
+    page_count = total_pages(paging)
+
+    if page_count is None:
+        # No page count to plan with: walk the pages one after another.
+        page = 1
+        while data and data.get("content"):
+            publications.extend(data["content"])
+            if data.get("paging", {}).get("last", True):
+                break
+            page += 1
+            data = fetch_page(conn, page, cache, fresh)
+        conn.close()
+    else:
+        conn.close()
+        # The first page tells us how many there are, so fetch the rest
+        # concurrently, each worker striding over its own connection.
+        rest = range(2, page_count + 1)
+        stripes = [rest[i::MAX_WORKERS] for i in range(MAX_WORKERS)]
+        stripes = [stripe for stripe in stripes if stripe]
+        pages = [data]
+        if stripes:
+            by_page = {}
+            fetch = partial(fetch_pages, cache=cache, fresh=fresh)
+            with ThreadPoolExecutor(max_workers=len(stripes)) as ex:
+                for stripe, results in zip(stripes, ex.map(fetch, stripes)):
+                    by_page.update(zip(stripe, results))
+            pages.extend(by_page[page] for page in rest)
+
+        # Concatenate in page order, stopping at the first failed page.
+        for data in pages:
+            if not data or not data.get("content"):
+                break
+            publications.extend(data["content"])
+
+    save_cache(fresh)
     print(f"Fetched {len(publications)} publications total.")
     return publications
 
 
-def extract_doi(pub):
-    """Extract DOI URL from a publication's identifiers."""
+def index_identifiers(pub):
+    """Scan a publication's identifiers once for its DOI URL and all URLs."""
+    doi = None
+    urls = []
     for ident in pub.get("identifiers", []):
-        source = ident.get("source", {})
-        source_type = source.get("type", {})
-        if source_type.get("label") == "DOI":
-            return ident.get("realUrl", "")
-    return ""
+        url = ident.get("realUrl", "")
+        urls.append(url)
+        if doi is None:
+            source = ident.get("source", {})
+            source_type = source.get("type", {})
+            if source_type.get("label") == "DOI":
+                doi = url
+    return {"doi": doi or "", "urls": urls}
 
 
 def extract_authors(pub):
     """Build formatted author string with the target author bolded."""
-    authorships = sorted(
-        [a for a in pub.get("authorships", []) if a.get("authorTyped", False)],
-        key=lambda a: a.get("listPosition", 999),
-    )
+    # Decorate with the list position once instead of calling a lambda
+    # per comparison; sort() is stable, so ties keep the API order.
+    authorships = [
+        (a.get("listPosition", 999), a)
+        for a in pub.get("authorships", ())
+        if a.get("authorTyped", False)
+    ]
+    authorships.sort(key=itemgetter(0))
 
     parts = []
-    for a in authorships:
+    for _, a in authorships:
         given = a.get("givenName", "")
         family = a.get("familyName", "")
         # Use first initial + family name
@@ -97,7 +275,7 @@ def extract_authors(pub):
 def clean_journal_title(raw_title):
     """Clean up journal titles that contain ISSN numbers or are ALL CAPS."""
     # Remove ISSN-like patterns (e.g., "2061-2079 2061-2125")
-    cleaned = re.sub(r"\s+\d{4}-\d{3}[\dXx](\s+\d{4}-\d{3}[\dXx])*", "", raw_title)
+    cleaned = ISSN_RE.sub("", raw_title)
     cleaned = cleaned.strip()
 
     # If the title is ALL CAPS, convert to Title Case
@@ -107,37 +285,54 @@ def clean_journal_title(raw_title):
     return cleaned
 
 
+@lru_cache(maxsize=256)
+def journal_title_html(raw_title):
+    """HTML-escaped clean_journal_title, memoized per distinct journal.
+
+    Most publications share a handful of journals, so the cleanup regex and
+    the escape run once per journal rather than once per publication.
+    """
+    return html.escape(clean_journal_title(raw_title))
+
+
 def extract_venue(pub):
-    """Extract venue/journal name from the publication."""
+    """Extract venue/journal name from the publication, HTML-escaped."""
     # For book chapters (conference papers), use the parent book title
     book = pub.get("book", {})
     if book:
-        venue = book.get("title", "")
+        title = book.get("title", "")
     else:
-        venue = ""
+        title = ""
 
     # For journal articles, use the journal info
     journal = pub.get("journal", {})
     if journal:
-        raw = journal.get("title", journal.get("label", venue))
-        venue = clean_journal_title(raw)
+        raw = journal.get("title", journal.get("label", title))
+        venue = journal_title_html(raw)
+    else:
+        venue = html.escape(title)
+
+    # Volume/issue/page info is short, so escaping it on its own is cheap
+    suffix = ""
 
     # Add volume/issue info for journals
     volume = pub.get("volume", "")
     issue = pub.get("issue", "")
     if volume:
-        venue += f", vol. {volume}"
+        suffix += f", vol. {volume}"
     if issue:
-        venue += f", no. {issue}"
+        suffix += f", no. {issue}"
 
     # Add page info
     first_page = pub.get("firstPage", "")
     last_page = pub.get("lastPage", "")
     if first_page and last_page and first_page != last_page:
-        venue += f", pp. {first_page}\u2013{last_page}"
+        suffix += f", pp. {first_page}\u2013{last_page}"
     elif first_page and last_page:
-        venue += f", p. {first_page}"
+        suffix += f", p. {first_page}"
 
+    if suffix:
+        venue += html.escape(suffix)
     return venue
 
 
@@ -163,8 +358,8 @@ def get_pub_type(pub):
     return "conference"
 
 
-def get_publisher(pub):
-    """Extract publisher info."""
+def get_publisher(pub, idents):
+    """Extract publisher info (``idents`` from index_identifiers)."""
     book = pub.get("book", {})
     if book:
         published_at = book.get("publishedAt", [])
@@ -176,15 +371,14 @@ def get_publisher(pub):
                 return "IEEE"
 
     # Check identifiers for IEEE Xplore links
-    for ident in pub.get("identifiers", []):
-        url = ident.get("realUrl", "")
+    for url in idents["urls"]:
         if "ieeexplore" in url:
             return "IEEE"
         if "springer" in url:
             return "Springer"
 
     # Check DOI prefix
-    doi = extract_doi(pub)
+    doi = idents["doi"]
     if "10.1109" in doi or "10.23919" in doi:
         return "IEEE"
     if "10.1007" in doi:
@@ -197,30 +391,29 @@ def get_publisher(pub):
 
 def build_html(publications):
     """Generate the publications HTML grouped by year."""
-    # Group by year
-    by_year = defaultdict(list)
-    for pub in publications:
-        year = pub.get("publishedYear", 0)
-        if year:
-            by_year[year].append(pub)
+    # MTMT already returns publications newest first, so this stable sort
+    # is a linear pass that just guarantees the grouping below is valid.
+    pubs = [pub for pub in publications if pub.get("publishedYear", 0)]
+    pubs.sort(key=itemgetter("publishedYear"), reverse=True)
 
-    html_parts = []
+    buf = io.StringIO()
 
     # Base indentation: 12 spaces (inside .main > section > .container)
     I = "            "  # 12 spaces
 
-    for year in sorted(by_year.keys(), reverse=True):
-        html_parts.append(f'{I}<div class="year-group">')
-        html_parts.append(f'{I}    <div class="year-label">{year}</div>')
-        html_parts.append("")
+    for year, year_pubs in groupby(pubs, key=itemgetter("publishedYear")):
+        buf.write(f'{I}<div class="year-group">\n')
+        buf.write(f'{I}    <div class="year-label">{year}</div>\n')
+        buf.write("\n")
 
-        for pub in by_year[year]:
+        for pub in year_pubs:
             title = html.escape(pub.get("title", "Unknown Title"))
-            doi_url = extract_doi(pub)
+            idents = index_identifiers(pub)
+            doi_url = idents["doi"]
             authors = extract_authors(pub)
-            venue = html.escape(extract_venue(pub))
+            venue = extract_venue(pub)
             pub_type = get_pub_type(pub)
-            publisher = get_publisher(pub)
+            publisher = get_publisher(pub, idents)
             # Use citingPubCount as the total
             citing_total = pub.get("citingPubCount", 0)
 
@@ -233,17 +426,6 @@ def build_html(publications):
             else:
                 title_html = title
 
-            html_parts.append(f'{I}    <div class="pub-item">')
-            html_parts.append(f'{I}        <div class="pub-title">')
-            html_parts.append(f"{I}            {title_html}")
-            html_parts.append(f"{I}        </div>")
-            html_parts.append(
-                f'{I}        <div class="pub-authors">{authors}</div>'
-            )
-            html_parts.append(
-                f'{I}        <div class="pub-venue">{venue}</div>'
-            )
-
             # Meta line
             meta_parts = [
                 f'<span class="pub-badge {badge_class}">{badge_label}</span>'
@@ -254,18 +436,30 @@ def build_html(publications):
                 meta_parts.append(
                     f'<span class="badge-citations">Cited by {citing_total}</span>'
                 )
+            meta_html = "".join(f"{I}            {mp}\n" for mp in meta_parts)
+
+            # The adjacent literals compile into a single f-string, so each
+            # publication is formatted and written in one go.
+            buf.write(
+                f'{I}    <div class="pub-item">\n'
+                f'{I}        <div class="pub-title">\n'
+                f"{I}            {title_html}\n"
+                f"{I}        </div>\n"
+                f'{I}        <div class="pub-authors">{authors}</div>\n'
+                f'{I}        <div class="pub-venue">{venue}</div>\n'
+                f'{I}        <div class="pub-meta">\n'
+                f"{meta_html}"
+                f"{I}        </div>\n"
+                f"{I}    </div>\n"
+                "\n"
+            )
 
-            html_parts.append(f'{I}        <div class="pub-meta">')
-            for mp in meta_parts:
-                html_parts.append(f"{I}            {mp}")
-            html_parts.append(f"{I}        </div>")
-            html_parts.append(f"{I}    </div>")
-            html_parts.append("")
-
-        html_parts.append(f"{I}</div>")
-        html_parts.append("")
+        buf.write(f"{I}</div>\n")
+        buf.write("\n")
 
-    return "\n".join(html_parts)
+    # Every line carries its own newline; drop the last one to end the
+    # block the same way a "\n".join would.
+    return buf.getvalue().removesuffix("\n")
 
 
 def update_index(publications_html):
@@ -273,18 +467,21 @@ def update_index(publications_html):
     with open(INDEX_PATH, "r", encoding="utf-8") as f:
         content = f.read()
 
-    pattern = re.escape(MARKER_START) + r".*?" + re.escape(MARKER_END)
     replacement = (
         MARKER_START + "\n" + publications_html + "\n        " + MARKER_END
     )
 
-    new_content, count = re.subn(pattern, replacement, content, flags=re.DOTALL)
+    new_content, count = MARKERS_RE.subn(replacement, content)
 
     if count == 0:
         print("ERROR: Could not find publication markers in index.html!")
         print(f"Looking for: {MARKER_START} ... {MARKER_END}")
         return False
 
+    if new_content == content:
+        print("Publications unchanged; leaving index.html untouched.")
+        return True
+
     with open(INDEX_PATH, "w", encoding="utf-8") as f:
         f.write(new_content)
 